@@ -1,23 +1,55 @@
 import os
 import sys
-import shutil
 import zipfile
-import hashlib
+import posixpath
+import blake3
 import openai
+import pikepdf
 import requests
 import base64
 import io
+import functools
 import subprocess
+import tempfile
+import time
+import pathlib
+from PIL import Image
 from pptx import Presentation
 from pptx.util import Pt, Inches
-import xml.etree.ElementTree as ET
-from pptx.dml.color import RGBColor
+from pptx.shapes.group import GroupShape
+from lxml import etree as ET
 from pptx.enum.text import PP_ALIGN
 from collections import defaultdict
-from PyPDF2 import PdfFileReader, PdfFileWriter
+from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
+NON_TRANSLATABLE_CHARS = ['▪', ' ', 'A.', 'B.', 'C.', 'D.', 'E.']
 
+# Texts longer than this may be split over several output lines by lou_translate, so
+# they are not batched. The limit is conservative; a mismatch is still handled.
+BRAILLE_BATCH_MAX_LENGTH = 1024
+
+NAMESPACES = {
+    'r': 'http://schemas.openxmlformats.org/package/2006/relationships',
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'
+}
+PIC_TAG = '{%s}pic' % NAMESPACES['p']
+BLIP_TAG = '{%s}blip' % NAMESPACES['a']
+EMBED_ATTR = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed'
+# Matches both the transitional and the strict Open XML image relationship types
+IMAGE_TYPE_SUFFIX = '/image'
+
+XML_PARSER = ET.XMLParser(remove_blank_text=False)
+
+# Large media are compared on a hash of their first PARTIAL_HASH_SIZE bytes before being fully hashed
+PARTIAL_HASH_SIZE = 65536
+# Media are hashed in 4MB chunks, so memory use does not grow with the file size
+HASH_BUF_SIZE = 4 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
 def ascii_to_braille(text):
     """
     Converts ASCII text to Braille using the 'louis' library.
@@ -28,8 +60,7 @@ def ascii_to_braille(text):
     Returns:
     str: The Braille equivalent of the input text.
     """
-    non_translatable_chars = ['▪', ' ', 'A.', 'B.', 'C.', 'D.', 'E.']
-    if text.strip() and text.strip() in non_translatable_chars:
+    if text.strip() and text.strip() in NON_TRANSLATABLE_CHARS:
         return text
 
     process = subprocess.Popen(['lou_translate', 'en-ueb-g2.ctb'],
@@ -39,24 +70,124 @@ def ascii_to_braille(text):
     stdout, stderr = process.communicate(input=text.encode())
     if process.returncode != 0:
         raise Exception(f"lou_translate failed: {stderr.decode()}")
-    return stdout.decode()
+    return _strip_line_terminator(stdout.decode())
+
+
+def _strip_line_terminator(text):
+    """Remove the single line terminator lou_translate appends to its output."""
+    if text.endswith('\r\n'):
+        return text[:-2]
+    if text.endswith('\n'):
+        return text[:-1]
+    return text
+
+
+def ascii_to_braille_batch(texts):
+    """
+    Converts a list of ASCII texts to Braille with a single 'lou_translate' process.
+
+    lou_translate translates its input line by line, so the texts are sent newline
+    separated and the output is split back on newlines. Repeated texts are only
+    translated once. Texts that contain a line break, or are long enough that
+    lou_translate may split them, are translated on their own with ascii_to_braille,
+    as is the whole batch if the output lines do not match the input.
+
+    Parameters:
+    texts (list of str): The ASCII texts to convert.
+
+    Returns:
+    list of str: The Braille equivalents, in the same order as the input.
+    """
+    translations = {}
+    pending = []
+    for text in dict.fromkeys(texts):
+        if text.strip() and text.strip() in NON_TRANSLATABLE_CHARS:
+            translations[text] = text
+        elif '\n' in text or '\r' in text or len(text) > BRAILLE_BATCH_MAX_LENGTH:
+            translations[text] = ascii_to_braille(text)
+        else:
+            pending.append(text)
+
+    if not pending:
+        return [translations[text] for text in texts]
+
+    process = subprocess.Popen(['lou_translate', 'en-ueb-g2.ctb'],
+                               stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    batch = ''.join(text + '\n' for text in pending)
+    stdout, stderr = process.communicate(input=batch.encode())
+    if process.returncode != 0:
+        raise Exception(f"lou_translate failed: {stderr.decode()}")
 
+    lines = _strip_line_terminator(stdout.decode()).split('\n')
+    if len(lines) == len(pending):
+        translations.update(zip(pending, (line.removesuffix('\r') for line in lines)))
+    else:
+        translations.update((text, ascii_to_braille(text)) for text in pending)
+    return [translations[text] for text in texts]
 
-def hash_file(filepath):
-    """Return the SHA-1 hash of the file."""
-    BUF_SIZE = 65536  # Read in 64kb chunks
-    sha1 = hashlib.sha1()
 
-    with open(filepath, 'rb') as f:
-        while True:
-            data = f.read(BUF_SIZE)
-            if not data:
-                break
-            sha1.update(data)
-    return sha1.hexdigest()
+def _hash_items(hash_func, items, max_workers):
+    """Return (item, hash) pairs, hashing on max_workers threads."""
+    if max_workers == 1:
+        return [(item, hash_func(item)) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(hash_func, item): item for item in items}
+        return [(futures[future], future.result()) for future in as_completed(futures)]
+
+
+def iter_shapes(container):
+    """Yield every shape in a slide or group shape, descending into group shapes."""
+    for shape in container.shapes:
+        yield shape
+        # isinstance rather than shape_type, which raises for some valid p:sp shapes
+        if isinstance(shape, GroupShape):
+            yield from iter_shapes(shape)
+
+
+def collect_text_targets(presentation):
+    """
+    Collects the paragraph and run XML elements of all text in a PowerPoint presentation,
+    including text in tables and group shapes, so several passes can share one tree walk.
+
+    Parameters:
+    presentation (pptx.Presentation): The presentation to walk.
+
+    Returns:
+    tuple: (runs, paragraphs), the lists of a:r and a:p lxml elements.
+    """
+    runs = []
+    paragraphs = []
+    for slide in presentation.slides:
+        for shape in iter_shapes(slide):
+            if shape.has_text_frame:
+                text_frames = [shape.text_frame]
+            elif shape.has_table:
+                text_frames = [cell.text_frame for row in shape.table.rows for cell in row.cells]
+            else:
+                continue
+            for text_frame in text_frames:
+                for paragraph in text_frame.paragraphs:
+                    paragraphs.append(paragraph._p)
+                    runs.extend(run._r for run in paragraph.runs)
+    return runs, paragraphs
+
+
+def _set_run_font(r, font_name, font_size=None):
+    """
+    Applies the font name, upright style, black color and optional size to an a:r element
+    by editing its a:rPr directly rather than through python-pptx's Font descriptors.
+    """
+    rPr = r.get_or_add_rPr()
+    rPr.set('i', '0')
+    if font_size is not None:
+        rPr.set('sz', str(int(font_size * 100)))
+    rPr.get_or_change_to_solidFill().get_or_change_to_srgbClr().set('val', '000000')
+    rPr.get_or_add_latin().set('typeface', font_name)
     
 
-def modify_presentation_font(presentation, font_name, font_size, spacing_size=50):
+def modify_presentation_font(presentation, font_name, font_size, spacing_size=50, targets=None):
     """
     Modifies the font name and size for all text in a PowerPoint presentation.
 
@@ -64,6 +195,9 @@ def modify_presentation_font(presentation, font_name, font_size, spacing_size=50
     presentation (pptx.Presentation): The presentation to modify.
     font_name (str): The name of the font to use.
     font_size (int): The size of the font.
+    spacing_size (int): Ignored. Kept for backward compatibility; character spacing was
+    never applied to the runs, and is still not.
+    targets (tuple): Optional result of collect_text_targets(presentation), to reuse its walk.
 
     Returns:
     pptx.Presentation: The modified presentation.
@@ -75,61 +209,33 @@ def modify_presentation_font(presentation, font_name, font_size, spacing_size=50
             print(f"Your answer {answer} is not 'yes' or 'no', please enter one of them")
 
     change_font_size = (answer == 'yes')
-            
-    for slide in presentation.slides:
-        shapes_to_process = list(slide.shapes)
-        while shapes_to_process:
-            shape = shapes_to_process.pop()
-            if shape.has_text_frame:
-                for paragraph in shape.text_frame.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.name = font_name
-                        run.font.space = Pt(spacing_size)
-                        run.font.italic = False
-                        run.font.color.rgb = RGBColor(0, 0, 0)
-                        if change_font_size:
-                            run.font.size = Pt(font_size)
-            elif shape.has_table:
-                for row in shape.table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.text_frame.paragraphs:
-                            for run in paragraph.runs:
-                                run.font.name = font_name
-                                run.font.space = Pt(spacing_size)
-                                run.font.italic = False
-                                run.font.color.rgb = RGBColor(0, 0, 0)
-                                if change_font_size:
-                                    run.font.size = Pt(font_size)
-            elif shape.shape_type == 6:  # Group shape
-                shapes_to_process.extend(shape.shapes)
+    run_font_size = font_size if change_font_size else None
+
+    if targets is None:
+        targets = collect_text_targets(presentation)
+    runs, _ = targets
+    for r in runs:
+        _set_run_font(r, font_name, run_font_size)
     return presentation
 
 
-def modify_presentation_spacing(presentation, line_spacing_value):
+def modify_presentation_spacing(presentation, line_spacing_value, targets=None):
     """
     Modifies the line spacing for all text in a PowerPoint presentation.
 
     Parameters:
     presentation (pptx.Presentation): The presentation to modify.
     line_spacing_value (float): The line spacing value to set.
+    targets (tuple): Optional result of collect_text_targets(presentation), to reuse its walk.
 
     Returns:
     pptx.Presentation: The modified presentation.
     """
-    for slide in presentation.slides:
-        shapes_to_process = list(slide.shapes)
-        while shapes_to_process:
-            shape = shapes_to_process.pop()
-            if shape.has_text_frame:
-                for paragraph in shape.text_frame.paragraphs:
-                    paragraph.line_spacing = line_spacing_value
-            elif shape.has_table:
-                for row in shape.table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.text_frame.paragraphs:
-                            paragraph.line_spacing = line_spacing_value
-            elif shape.shape_type == 6:  # Group shape
-                shapes_to_process.extend(shape.shapes)
+    if targets is None:
+        targets = collect_text_targets(presentation)
+    _, paragraphs = targets
+    for p in paragraphs:
+        p.get_or_add_pPr().line_spacing = line_spacing_value
     return presentation
 
 
@@ -144,62 +250,129 @@ def contract_braille(presentation, verbose=False):
     Returns:
     pptx.Presentation: The modified presentation.
     """
+    runs = []
     for slide in presentation.slides:
         for shape in slide.shapes:
             if shape.has_text_frame:
                 for paragraph in shape.text_frame.paragraphs:
-                    for run in paragraph.runs:
-                        if verbose:
-                            print(f'Original: {run.text}')
-                        run.text = ascii_to_braille(run.text)
-                        if verbose:
-                            print(f'Modified: {run.text}')
+                    runs.extend(paragraph.runs)
+
+    translations = ascii_to_braille_batch([run.text for run in runs])
+    for run, translation in zip(runs, translations):
+        if verbose:
+            print(f'Original: {run.text}')
+        run.text = translation
+        if verbose:
+            print(f'Modified: {run.text}')
     return presentation
 
 
-def remove_repetitive_images(pptx_path, image_dir):
+def _find_repeated(sizes, threshold, hash_func, head_hash_func, max_workers):
+    """
+    Groups items by the hash of their content, returning (hash_counts, file_hashes).
+    Items are grouped by size (and, for large items, by a hash of their first
+    PARTIAL_HASH_SIZE bytes) first, so only groups big enough to pass the threshold
+    get fully hashed.
+
+    Parameters:
+    sizes (dict): Maps each item to its size in bytes.
+    threshold (float): Groups with no more members than this are never hashed.
+    hash_func (callable): Returns the full content hash of an item.
+    head_hash_func (callable): Returns the hash of the first PARTIAL_HASH_SIZE bytes of an item.
+    max_workers (int): Number of hashing threads.
+    """
+    hash_counts = defaultdict(int)
+    file_hashes = defaultdict(list)
+
+    # A hash can only repeat more than `threshold` times if its size does too
+    size_groups = defaultdict(list)
+    for item, size in sizes.items():
+        size_groups[size].append(item)
+
+    candidates = []
+    partial_candidates = []
+    for size, items in size_groups.items():
+        if len(items) <= threshold:
+            continue
+        if size > PARTIAL_HASH_SIZE:
+            partial_candidates.append(items)
+        else:
+            candidates.extend(items)
+
+    for items in partial_candidates:
+        head_groups = defaultdict(list)
+        for item, head_hash in _hash_items(head_hash_func, items, max_workers):
+            head_groups[head_hash].append(item)
+        for head_items in head_groups.values():
+            if len(head_items) > threshold:
+                candidates.extend(head_items)
+
+    for item, file_hash in _hash_items(hash_func, candidates, max_workers):
+        hash_counts[file_hash] += 1
+        file_hashes[file_hash].append(item)
+    return hash_counts, file_hashes
+
+
+def find_repetitive_media(zin, num_slides, max_workers=None):
     """
-    Processes files in a directory based on the slide count of a PowerPoint presentation.
-    It hashes all files in the directory, and if a hash repeats for more than 80% of the
-    slide count in the PowerPoint file, all files with that hash are deleted.
+    Finds the repetitive images of an open PPTX archive, without extracting it.
+    A file in 'ppt/media' is repetitive when its hash repeats for more than 80% of
+    the slide count.
 
     Parameters:
-    pptx_path (str): Path to the PowerPoint file.
-    image_dir (str): Path to the directory containing images.
+    zin (zipfile.ZipFile): The PowerPoint file, opened for reading.
+    num_slides (int): Number of slides in the PowerPoint presentation.
+    max_workers (int): Number of hashing threads. Defaults to the CPU count; use 1 to
+    hash serially.
 
     Returns:
-    None
+    set: The archive member names of the repetitive images.
     """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
 
-    prs = Presentation(pptx_path)
-    num_slides = len(prs.slides)
+    threshold = 0.8 * num_slides
 
-    hash_counts = defaultdict(int)
-    file_hashes = defaultdict(list)
+    sizes = {info.filename: info.file_size for info in zin.infolist()
+             if info.filename.startswith('ppt/media/') and not info.is_dir()}
+
+    def hash_member(name):
+        # Members are already hashed on max_workers threads, so each hasher uses one
+        h = blake3.blake3(max_threads=1)
+        buf = bytearray(HASH_BUF_SIZE)
+        view = memoryview(buf)
+        with zin.open(name) as f:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                h.update(view[:n])
+        return h.hexdigest()
+
+    def hash_member_head(name):
+        with zin.open(name) as f:
+            return blake3.blake3(f.read(PARTIAL_HASH_SIZE)).hexdigest()
+
+    hash_counts, member_hashes = _find_repeated(sizes, threshold, hash_member, hash_member_head, max_workers)
+    print(hash_counts)
+
+    repetitive = set()
+    for member_hash, names in member_hashes.items():
+        if hash_counts[member_hash] > threshold:
+            repetitive.update(names)
+            for name in names:
+                print(f"Removed {name}")
+    return repetitive
 
-    for filename in os.listdir(image_dir):
-        file_path = os.path.join(image_dir, filename)
-        if os.path.isfile(file_path):
-            file_hash = hash_file(file_path)
-            hash_counts[file_hash] += 1
-            file_hashes[file_hash].append(file_path)
-    print(hash_counts)  
 
-    threshold = 0.8 * num_slides
-    for file_hash, files in file_hashes.items():
-        if hash_counts[file_hash] > threshold:
-            for file_path in files:
-                os.remove(file_path)
-                print(f"Deleted {file_path}")
-                
-                
 def clean_pptx(pptx_path, output_path):
     """
-    Cleans a PowerPoint (PPTX) file by removing references to non-existing images.
+    Cleans a PowerPoint (PPTX) file by removing repetitive images and references to
+    non-existing images.
 
-    This function decompresses the PPTX file, parses the XML structure to find and 
-    remove references to missing images, and then repacks the cleaned presentation 
-    into a new PPTX file.
+    This function reads the PPTX archive in memory, drops the repetitive images, parses
+    the slide XML to remove references to missing images, and writes the cleaned
+    presentation into a new PPTX file. Every entry keeps its original compression method.
 
     Args:
     pptx_path (str): The file path of the input PowerPoint file.
@@ -211,65 +384,78 @@ def clean_pptx(pptx_path, output_path):
     if not os.path.exists(pptx_path):
         raise FileNotFoundError(f"The specified PPTX file does not exist: {pptx_path}")
 
-    temp_dir = 'temp_pptx'
-    os.makedirs(temp_dir, exist_ok=True)
-
-    with zipfile.ZipFile(pptx_path, 'r') as zip_ref:
-        zip_ref.extractall(temp_dir)
-        
-    image_dir = os.path.join('temp_pptx', os.path.join('ppt', 'media'))
-    remove_repetitive_images(pptx_path, image_dir)
-
-    namespaces = {
-        'r': 'http://schemas.openxmlformats.org/package/2006/relationships',
-        'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
-        'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'
-    }
-
-    for rels_file in os.listdir(os.path.join(temp_dir, 'ppt', 'slides', '_rels')):
-        if not rels_file.endswith('.rels'):
-            continue
-
-        tree = ET.parse(os.path.join(temp_dir, 'ppt', 'slides', '_rels', rels_file))
-        root = tree.getroot()
-
-        removed_ids = []
-        for relationship in root.findall('r:Relationship', namespaces):
-            if 'image' in relationship.attrib['Type']:
-                image_path = os.path.join(temp_dir, 'ppt', relationship.attrib['Target'].lstrip('/'))
-                image_path = str(os.path.join(temp_dir, 'ppt', relationship.attrib['Target'].lstrip('/')).replace('../', ''))
-                #print(image_path)
-                if not os.path.exists(image_path):
-                    removed_ids.append(relationship.attrib['Id'])
-                    root.remove(relationship)
-
-        tree.write(os.path.join(temp_dir, 'ppt', 'slides', '_rels', rels_file))
-
-        slide_file = rels_file.replace('.rels', '')
-        slide_tree = ET.parse(os.path.join(temp_dir, 'ppt', 'slides', slide_file))
-        slide_root = slide_tree.getroot()
-
-        for pic in slide_root.findall('.//p:pic', namespaces):
-            blip = pic.find('.//a:blip', namespaces)
-            if blip is not None and blip.attrib['{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed'] in removed_ids:
-                pic.getparent().remove(pic)
-
-        slide_tree.write(os.path.join(temp_dir, 'ppt', 'slides', slide_file))
-
-    with zipfile.ZipFile(output_path, 'w') as myzip:
-        for root, dirs, files in os.walk(temp_dir):
-            for file in files:
-                myzip.write(os.path.join(root, file), arcname=os.path.relpath(os.path.join(root, file), temp_dir))
-
-    shutil.rmtree(temp_dir)
+    with zipfile.ZipFile(pptx_path, 'r') as zin:
+        names = zin.namelist()
+
+        num_slides = sum(1 for name in names
+                         if posixpath.dirname(name) == 'ppt/slides'
+                         and posixpath.basename(name).startswith('slide') and name.endswith('.xml'))
+        removed_media = find_repetitive_media(zin, num_slides)
+        existing_names = set(names) - removed_media
+        # Slides share a small pool of media, so each distinct Target is resolved once
+        target_exists = {}
+
+        rewritten = {}
+        for rels_name in names:
+            if posixpath.dirname(rels_name) != 'ppt/slides/_rels' or not rels_name.endswith('.rels'):
+                continue
+
+            root = ET.fromstring(zin.read(rels_name), XML_PARSER)
+
+            removed_ids = set()
+            for relationship in root.findall('r:Relationship', NAMESPACES):
+                if relationship.attrib['Type'].endswith(IMAGE_TYPE_SUFFIX):
+                    target = relationship.attrib['Target']
+                    if target not in target_exists:
+                        image_path = posixpath.join('ppt', target.lstrip('/')).replace('../', '')
+                        #print(image_path)
+                        target_exists[target] = image_path in existing_names
+                    if not target_exists[target]:
+                        removed_ids.add(relationship.attrib['Id'])
+                        root.remove(relationship)
+
+            # Nothing to rewrite if none of the slide's images went missing
+            if not removed_ids:
+                continue
+
+            rewritten[rels_name] = ET.tostring(root, method='xml', xml_declaration=True,
+                                               encoding='UTF-8', standalone=True)
+
+            slide_name = posixpath.join('ppt/slides', posixpath.basename(rels_name).replace('.rels', ''))
+            slide_root = ET.fromstring(zin.read(slide_name), XML_PARSER)
+
+            # iter() walks the tree in C and still reaches pictures nested in group shapes
+            for pic in list(slide_root.iter(PIC_TAG)):
+                blip = next(pic.iter(BLIP_TAG), None)
+                if blip is not None and blip.attrib[EMBED_ATTR] in removed_ids:
+                    pic.getparent().remove(pic)
+
+            rewritten[slide_name] = ET.tostring(slide_root, method='xml', xml_declaration=True,
+                                                encoding='UTF-8', standalone=True)
+
+        with zipfile.ZipFile(output_path, 'w') as zout:
+            for info in zin.infolist():
+                if info.filename in removed_media:
+                    continue
+                data = rewritten.get(info.filename)
+                if data is None:
+                    data = zin.read(info)
+                # Write a copy so zin's directory entry is left untouched, keeping the
+                # source compression (media are usually stored, XML deflated)
+                out_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                out_info.compress_type = info.compress_type
+                out_info.external_attr = info.external_attr
+                zout.writestr(out_info, data)
     
     
-def query_gpt4_with_image(image_input, api_key):
+def query_gpt4_with_image(image_input, api_key, max_retries=5, timeout=120):
     """
     Queries GPT-4 with an image and returns the text output.
 
     :param image_input: Path to the image file or a PIL image object.
     :param api_key: API key for accessing the GPT-4 service.
+    :param max_retries: How many times to retry with exponential backoff when rate limited (HTTP 429).
+    :param timeout: Seconds to wait for the server before giving up on a request.
     :return: Text response from GPT-4.
     """
     
@@ -312,7 +498,17 @@ def query_gpt4_with_image(image_input, api_key):
         "max_tokens": 1000
     }
 
-    response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
+    for attempt in range(max_retries + 1):
+        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload,
+                                 timeout=timeout)
+        if response.status_code != 429 or attempt == max_retries:
+            break
+        # Retry-After may also be an HTTP date, in which case fall back to exponential backoff
+        try:
+            delay = float(response.headers.get('Retry-After', 2 ** attempt))
+        except ValueError:
+            delay = 2 ** attempt
+        time.sleep(delay)
 
     if response.status_code == 200:
         return response.json()['choices'][0]['message']['content']
@@ -320,26 +516,45 @@ def query_gpt4_with_image(image_input, api_key):
         raise Exception(f"Error querying GPT-4 with image: {response.status_code} - {response.text}")
 
 
+def query_gpt4_with_images(image_inputs, api_key, max_workers=8):
+    """
+    Queries GPT-4 with several images concurrently and returns the text outputs.
+
+    :param image_inputs: Iterable of image file paths or PIL image objects.
+    :param api_key: API key for accessing the GPT-4 service.
+    :param max_workers: Maximum number of requests in flight at once.
+    :return: List of text responses from GPT-4, in the same order as image_inputs.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda image_input: query_gpt4_with_image(image_input, api_key), image_inputs))
+
+
     
-def create_notes_slides(pptx_file, new_filename):
+def create_notes_slides(pptx_file, new_filename=None):
     """
     Creates a new PowerPoint presentation containing the notes from the original presentation.
 
     Parameters:
-    pptx_file (str): The path to the original PowerPoint file.
-    new_filename (str): The path for the new PowerPoint file with notes.
-    """
-    if not os.path.exists(pptx_file):
-        raise FileNotFoundError(f'The specified PPTX file does not exist: {pptx_file}')
+    pptx_file (str or pptx.Presentation): The path to the original PowerPoint file, or the
+    already opened presentation.
+    new_filename (str): The path for the new PowerPoint file with notes. If None, the new
+    presentation is not saved.
 
-    original_presentation = Presentation(pptx_file)
+    Returns:
+    pptx.Presentation: The new presentation with notes.
+    """
+    if isinstance(pptx_file, (str, os.PathLike)):
+        if not os.path.exists(pptx_file):
+            raise FileNotFoundError(f'The specified PPTX file does not exist: {pptx_file}')
+        original_presentation = Presentation(pptx_file)
+    else:
+        original_presentation = pptx_file
     new_presentation = Presentation()
     slide_width = new_presentation.slide_width
     slide_height = new_presentation.slide_height
     margin = Inches(0.5)
 
     for index, slide in enumerate(original_presentation.slides):
-        notes_slide = slide.notes_slide
         notes_text = 'This string will be replaced with the output of a function that generates detailed text descriptions of images.'
         new_slide_layout = new_presentation.slide_layouts[6]
         notes_slide = new_presentation.slides.add_slide(new_slide_layout)
@@ -353,7 +568,9 @@ def create_notes_slides(pptx_file, new_filename):
                 run.font.size = Pt(18)
             paragraph.alignment = PP_ALIGN.LEFT
 
-    new_presentation.save(new_filename)
+    if new_filename is not None:
+        new_presentation.save(new_filename)
+    return new_presentation
 
 
 def extract_images_from_pptx(pptx_file):
@@ -371,20 +588,26 @@ def extract_images_from_pptx(pptx_file):
     return pil_images
     
 
-def convert_pptx_to_pdf(pptx_file):
+def convert_pptx_to_pdf(pptx_file, profile_dir=None):
     """
     Converts a PowerPoint file to a PDF.
 
     Parameters:
     pptx_file (str): The path to the PowerPoint file to convert.
+    profile_dir (str): Optional LibreOffice user profile directory. Concurrent
+    conversions need distinct profiles, otherwise they wait on the same instance lock.
     """
     output_pdf = os.path.splitext(pptx_file)[0] + '.pdf'
 
     if not os.path.exists(pptx_file):
         raise FileNotFoundError(f'The specified PPTX file does not exist: {pptx_file}')
 
+    command = ['libreoffice', '--headless']
+    if profile_dir is not None:
+        command.append('-env:UserInstallation=' + pathlib.Path(profile_dir).resolve().as_uri())
+
     try:
-        subprocess.run(['libreoffice', '--headless', '--convert-to', 'pdf', pptx_file, '--outdir', os.path.dirname(output_pdf)])
+        subprocess.run(command + ['--convert-to', 'pdf', pptx_file, '--outdir', os.path.dirname(output_pdf)])
         print(f'File converted successfully. Saved as {output_pdf}.')
     except Exception as error:
         print(f'An error occurred during file conversion: {error}')
@@ -405,17 +628,13 @@ def interleave_pdfs(file1, file2, output_file):
         raise FileNotFoundError(f'The specified PDF file does not exist: {file2}')
 
     try:
-        pdf1 = PdfFileReader(file1)
-        pdf2 = PdfFileReader(file2)
-        pdf_writer = PdfFileWriter()
-        for i in range(max(pdf1.getNumPages(), pdf2.getNumPages())):
-            if i < pdf1.getNumPages():
-                pdf_writer.addPage(pdf1.getPage(i))
-            if i < pdf2.getNumPages():
-                pdf_writer.addPage(pdf2.getPage(i))
-
-        with open(output_file, 'wb') as output:
-            pdf_writer.write(output)
+        with pikepdf.open(file1) as pdf1, pikepdf.open(file2) as pdf2, pikepdf.Pdf.new() as pdf_writer:
+            for page1, page2 in zip_longest(pdf1.pages, pdf2.pages):
+                if page1 is not None:
+                    pdf_writer.pages.append(page1)
+                if page2 is not None:
+                    pdf_writer.pages.append(page2)
+            pdf_writer.save(output_file)
 
         print(f'PDFs interleaved successfully and saved to {output_file}.')
     except Exception as error:
@@ -426,29 +645,37 @@ def main():
     new_filename = sys.argv[1].rsplit('.', 1)[0] + '_cleaned_images.pptx'
     clean_pptx(sys.argv[1], new_filename)
     
+    # Load the lecture slides
+    presentation = Presentation(new_filename)
+
     # Create 'notes' presentation
     notes_filename = sys.argv[1].rsplit('.', 1)[0] + '_notes.pptx'
     print(notes_filename)
-    create_notes_slides(new_filename, notes_filename)
+    notes_presentation = create_notes_slides(presentation)
 
-    # Load the lecture slides
-    presentation = Presentation(new_filename)
-    #presentation = modify_presentation_font(presentation=presentation, font_name='Braille', font_size=14)
-    presentation = modify_presentation_spacing(presentation, 1.2)
+    targets = collect_text_targets(presentation)
+    #presentation = modify_presentation_font(presentation=presentation, font_name='Braille', font_size=14, targets=targets)
+    presentation = modify_presentation_spacing(presentation, 1.2, targets)
     #presentation = contract_braille(presentation)
 
     # Save the modified presentation
     base = os.path.splitext(sys.argv[1])[0]
     new_filename = base + "_braille.pptx"
     presentation.save(new_filename)
-    convert_pptx_to_pdf(new_filename)
 
-    # Load the notes presentation
-    notes_presentation = Presentation(notes_filename)
+    # Save the notes presentation
     #notes_presentation = modify_presentation_font(presentation=notes_presentation, font_name='Braille', font_size=14)
     #notes_presentation = contract_braille(notes_presentation)
     notes_presentation.save(notes_filename)
-    convert_pptx_to_pdf(notes_filename)
+
+    # Convert both presentations at once, each LibreOffice with its own per-run profile
+    with tempfile.TemporaryDirectory(prefix='lo-slides-') as slides_profile, \
+            tempfile.TemporaryDirectory(prefix='lo-notes-') as notes_profile, \
+            ThreadPoolExecutor(max_workers=2) as executor:
+        conversions = [executor.submit(convert_pptx_to_pdf, filename, profile)
+                       for filename, profile in [(new_filename, slides_profile), (notes_filename, notes_profile)]]
+        for conversion in conversions:
+            conversion.result()
     
     # Combine the lecture slides and 'notes' slides
     interleaved_filename = os.path.splitext(new_filename)[0] + '_with_notes.pdf'